@@ -4,12 +4,14 @@
 # Branch Protection Setup Script (Python)
 # ========================================
 #
-# This script configures branch protection for the master branch using the
-# GitHub API. It ensures all CI jobs must pass before merging.
+# This script configures branch protection for the master branch (or the
+# branches given with --branch) using the GitHub API. It ensures all CI jobs
+# must pass before merging.
 #
 # Prerequisites:
-# - Python 3.7+
+# - Python 3.10+
 # - requests library: pip install requests
+# - orjson (optional, faster JSON): pip install orjson
 # - GitHub token with repo permissions
 #
 # Usage:
@@ -20,45 +22,101 @@
 #     # Or using gh CLI token
 #     export GITHUB_TOKEN=$(gh auth token)
 #     python setup-branch-protection.py
+#
+#     # Non-interactive (CI), several branches at once
+#     python setup-branch-protection.py --yes --branch master --branch develop
 # """
 #
+# import argparse
+# import configparser
+# import json
 # import os
+# import random
+# import re
 # import sys
-# from typing import Any
+# import threading
+# import time
+# from collections.abc import Callable, Mapping, Sequence
+# from concurrent.futures import ThreadPoolExecutor
+# from pathlib import Path
+# from types import MappingProxyType
+# from typing import Any, TextIO
 #
 # import requests
+# from requests.adapters import HTTPAdapter
+# from urllib3.util import Retry
+#
+# try:
+#     import orjson  # Optional: faster JSON encoding/decoding (pip install orjson)
+# except ImportError:
+#     orjson = None
 #
 # # Configuration
 # OWNER = os.getenv("GITHUB_OWNER", "")  # Set via environment or edit here
 # REPO = os.getenv("GITHUB_REPO", "")  # Set via environment or edit here
 # BRANCH = "master"
 # GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "")
-#
-# # Branch Protection Configuration
-# PROTECTION_CONFIG: dict[str, Any] = {
-#     "required_status_checks": {
-#         "strict": True,  # Require branch to be up to date before merging
-#         "contexts": [
-#             "quality",  # Code Quality job from ci.yml
-#             "deploy",  # Deploy job from ci.yml
-#         ],
-#     },
-#     "enforce_admins": True,  # Apply rules to administrators too
-#     "required_pull_request_reviews": {
-#         "dismiss_stale_reviews": True,  # Re-approve after new commits
-#         "require_code_owner_reviews": False,  # Don't require CODEOWNERS approval
-#         "required_approving_review_count": 1,  # Number of approvals needed
-#         "require_last_push_approval": True,  # Approve most recent push
-#         "dismissal_restrictions": {},  # No restrictions on who can dismiss
-#     },
-#     "restrictions": None,  # No push restrictions (blocks all direct pushes)
-#     "required_linear_history": True,  # Prevent merge commits
-#     "allow_force_pushes": False,  # Block force pushes
-#     "allow_deletions": False,  # Block branch deletion
-#     "required_conversation_resolution": True,  # Resolve all comments
-#     "lock_branch": False,  # Don't lock branch (allow PRs)
-#     "allow_fork_syncing": True,  # Allow fork syncing
-# }
+# MAX_CONCURRENT_BRANCHES = 5  # Stay well below GitHub's secondary rate limits
+# RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+# # Matches owner/repo in HTTPS (https://github.com/o/r.git) and SSH (git@github.com:o/r.git) remotes
+# _REMOTE_RE = re.compile(r"github\.com[:/]([^/]+)/([^/]+?)(?:\.git)?/?$")
+# CACHE_DIR = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "branch-protection"
+#
+# # Shared HTTP session: one connection pool (and TLS handshake) for all API calls.
+# # protect_many() sets its Authorization header from the token it is given.
+# _SESSION = requests.Session()
+# _SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=MAX_CONCURRENT_BRANCHES, max_retries=Retry(total=0)))
+# _SESSION.headers.update({"Accept": "application/vnd.github+json", "X-GitHub-Api-Version": "2022-11-28"})
+#
+# # Per-thread output buffer: protect_many() collects each branch's messages and
+# # prints them as one block, so concurrent branches don't interleave
+# _OUTPUT = threading.local()
+#
+# # Token guidance is printed once per protect_many() batch, not once per branch
+# _AUTH_HINT_LOCK = threading.Lock()
+# _AUTH_HINT_SHOWN = threading.Event()
+#
+# # Branch Protection Configuration (read-only, so it can't drift from _PROTECTION_BODY)
+# PROTECTION_CONFIG: Mapping[str, Any] = MappingProxyType(
+#     {
+#         "required_status_checks": MappingProxyType(
+#             {
+#                 "strict": True,  # Require branch to be up to date before merging
+#                 "contexts": (
+#                     "quality",  # Code Quality job from ci.yml
+#                     "deploy",  # Deploy job from ci.yml
+#                 ),
+#             }
+#         ),
+#         "enforce_admins": True,  # Apply rules to administrators too
+#         "required_pull_request_reviews": MappingProxyType(
+#             {
+#                 "dismiss_stale_reviews": True,  # Re-approve after new commits
+#                 "require_code_owner_reviews": False,  # Don't require CODEOWNERS approval
+#                 "required_approving_review_count": 1,  # Number of approvals needed
+#                 "require_last_push_approval": True,  # Approve most recent push
+#                 "dismissal_restrictions": MappingProxyType({}),  # No restrictions on who can dismiss
+#             }
+#         ),
+#         "restrictions": None,  # No push restrictions (blocks all direct pushes)
+#         "required_linear_history": True,  # Prevent merge commits
+#         "allow_force_pushes": False,  # Block force pushes
+#         "allow_deletions": False,  # Block branch deletion
+#         "required_conversation_resolution": True,  # Resolve all comments
+#         "lock_branch": False,  # Don't lock branch (allow PRs)
+#         "allow_fork_syncing": True,  # Allow fork syncing
+#     }
+# )
+#
+# # Shared read-only defaults for missing sections of API responses
+# _EMPTY: Mapping[str, Any] = MappingProxyType({})
+# _NO_CONTEXTS: tuple[str, ...] = ()
+#
+# # The payload never changes, so serialize it once instead of on every PUT
+# if orjson:
+#     _PROTECTION_BODY = orjson.dumps(PROTECTION_CONFIG, default=dict)
+# else:
+#     _PROTECTION_BODY = json.dumps(PROTECTION_CONFIG, separators=(",", ":"), default=dict).encode()
 #
 #
 # def print_header(text: str) -> None:
@@ -70,59 +128,227 @@
 #     print("")
 #
 #
+# def emit(text: str, file: TextIO | None = None) -> None:
+#     """Print a line, or buffer it if the current thread is collecting output"""
+#     stream = file or sys.stdout
+#     lines = getattr(_OUTPUT, "lines", None)
+#     if lines is None:
+#         print(text, file=stream)
+#     else:
+#         lines.append((text, stream))
+#
+#
 # def print_success(text: str) -> None:
 #     """Print success message"""
-#     print(f"✅ {text}")
+#     emit(f"✅ {text}")
 #
 #
 # def print_error(text: str) -> None:
 #     """Print error message"""
-#     print(f"❌ {text}", file=sys.stderr)
+#     emit(f"❌ {text}", file=sys.stderr)
 #
 #
 # def print_warning(text: str) -> None:
 #     """Print warning message"""
-#     print(f"⚠️  {text}")
+#     emit(f"⚠️  {text}")
 #
 #
 # def print_info(text: str) -> None:
 #     """Print info message"""
-#     print(f"ℹ️  {text}")
+#     emit(f"ℹ️  {text}")
 #
 #
-# def get_repo_info() -> tuple:
-#     """Get repository information from git remote"""
+# def _git_config_path() -> Path | None:
+#     """Locate the config file of the git repository in the current directory"""
+#     dot_git = Path(".git")
+#     if dot_git.is_dir():
+#         return dot_git / "config"
+#
+#     try:
+#         # Worktrees and submodules: .git is a file pointing at the real git dir
+#         content = dot_git.read_text().strip()
+#         if not content.startswith("gitdir:"):
+#             return None
+#         git_dir = Path(content.removeprefix("gitdir:").strip())
+#
+#         # Worktrees keep the shared config in the main repository ("commondir")
+#         common_dir = git_dir / "commondir"
+#         if common_dir.is_file():
+#             git_dir = git_dir / common_dir.read_text().strip()
+#         return git_dir / "config"
+#     except OSError:
+#         return None
+#
+#
+# def _read_remote_url() -> str | None:
+#     """Get the origin URL by asking git (slow path)"""
 #     import subprocess
 #
 #     try:
-#         # Get remote URL
 #         result = subprocess.run(["git", "remote", "get-url", "origin"], capture_output=True, text=True, check=True)
-#         remote_url = result.stdout.strip()
+#         return result.stdout.strip()
+#     except (OSError, subprocess.CalledProcessError):
+#         return None
+#
+#
+# def get_repo_info() -> tuple:
+#     """
+#     Get repository information from git remote
+#
+#     The origin URL is read straight from the git config when that is
+#     unambiguous. Anything configparser can't interpret the way git does
+#     (url.<base>.insteadOf rewrites, quoted values, inline comments, escapes)
+#     or a URL that doesn't parse falls back to asking git, so the fast path
+#     only ever skips running git and never changes the result.
+#     """
+#     remote_url = None
+#     config_path = _git_config_path()
+#     if config_path:
+#         parser = configparser.ConfigParser(strict=False, interpolation=None)
+#         try:
+#             parser.read(config_path)
+#             if not any(section.startswith("url ") for section in parser.sections()):
+#                 remote_url = parser.get('remote "origin"', "url", fallback=None)
+#         except (OSError, configparser.Error):
+#             pass
+#
+#     # Parse owner and repo from URL (handles both HTTPS and SSH URLs)
+#     match = None
+#     if remote_url and not any(char in remote_url for char in '"#;\\'):
+#         match = _REMOTE_RE.search(remote_url)
+#     if not match:
+#         remote_url = _read_remote_url()
+#         match = _REMOTE_RE.search(remote_url) if remote_url else None
+#
+#     return (match.group(1), match.group(2)) if match else (None, None)
+#
+#
+# def _etag_path(owner: str, repo: str, branch: str) -> Path:
+#     """Get the cache file holding the last seen protection ETag"""
+#     return CACHE_DIR / f"{owner}-{repo}-{branch.replace('/', '_')}.etag"
+#
+#
+# def load_etag(owner: str, repo: str, branch: str) -> str | None:
+#     """Load the cached protection ETag, if any"""
+#     try:
+#         return _etag_path(owner, repo, branch).read_text().strip() or None
+#     except OSError:
+#         return None
+#
+#
+# def store_etag(owner: str, repo: str, branch: str, etag: str | None) -> None:
+#     """Cache the protection ETag (best effort, failures are ignored)"""
+#     if not etag:
+#         return
+#
+#     try:
+#         path = _etag_path(owner, repo, branch)
+#         path.parent.mkdir(parents=True, exist_ok=True)
+#         path.write_text(etag)
+#     except OSError:
+#         pass
+#
+#
+# def _is_retryable(response: requests.Response) -> bool:
+#     """Check whether a response is a transient failure worth retrying"""
+#     if response.status_code in RETRYABLE_STATUS_CODES:
+#         return True
+#     # Secondary rate limits are reported as 403 with a Retry-After header
+#     return response.status_code == 403 and "Retry-After" in response.headers
+#
+#
+# def _with_retry(fn: Callable[[], requests.Response], *, max_retries: int = 3, base: float = 1.0, cap: float = 30.0) -> requests.Response:
+#     """
+#     Call fn, retrying transient failures with exponential backoff and jitter
+#
+#     Connection errors, timeouts and rate limit / gateway responses are retried
+#     up to max_retries times. A Retry-After header takes precedence over the
+#     computed delay, unless it asks for more than cap seconds: then the response
+#     is returned as-is rather than stalling the run. Any other response
+#     (including 401/403/404) is returned as-is too.
+#     """
+#     for attempt in range(max_retries):
+#         try:
+#             response = fn()
+#         except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+#             retry_after = None
+#         else:
+#             if not _is_retryable(response):
+#                 return response
+#             retry_after = response.headers.get("Retry-After")
+#
+#         if retry_after and retry_after.isdigit():
+#             delay = float(retry_after)
+#             if delay > cap:
+#                 return response
+#         else:
+#             delay = min(cap, base * (2**attempt) * (0.5 + random.random()))  # nosec B311 - jitter, not crypto
+#         print_warning(f"Request failed, retrying in {delay:.1f}s ({attempt + 1}/{max_retries})")
+#         time.sleep(delay)
+#
+#     return fn()
+#
+#
+# def _on_put_applied(response: requests.Response, target: str) -> bool:
+#     """Handle 200: protection applied"""
+#     print_success(f"Branch protection applied successfully to {target}!")
+#     return True
+#
+#
+# def _on_put_unauthorized(response: requests.Response, target: str) -> bool:
+#     """Handle 401: bad or missing token"""
+#     print_error(f"Authentication failed for {target}. Check your GITHUB_TOKEN.")
+#     with _AUTH_HINT_LOCK:
+#         show_hint = not _AUTH_HINT_SHOWN.is_set()
+#         _AUTH_HINT_SHOWN.set()
+#     if show_hint:
+#         print_info("Generate a token at: https://github.com/settings/tokens")
+#         print_info("Required scopes: repo (full control)")
+#     return False
+#
+#
+# def _on_put_rate_limited(response: requests.Response, target: str) -> bool:
+#     """Handle 429 (and rate limited 403s): retries exhausted or Retry-After too long"""
+#     retry_after = response.headers.get("Retry-After")
+#     print_error(f"Rate limited by GitHub while protecting {target}.")
+#     if retry_after:
+#         print_info(f"Retry after {retry_after}s.")
+#     return False
+#
 #
-#         # Parse owner and repo from URL
-#         # Handles both HTTPS and SSH URLs
-#         if "github.com" in remote_url:
-#             # Remove .git suffix
-#             remote_url = remote_url.replace(".git", "")
+# def _on_put_forbidden(response: requests.Response, target: str) -> bool:
+#     """Handle 403: token lacks admin access, unless it is a secondary rate limit"""
+#     if "Retry-After" in response.headers:
+#         return _on_put_rate_limited(response, target)
+#     print_error(f"Permission denied for {target}. You need admin access to this repository.")
+#     return False
 #
-#             # Extract owner/repo
-#             if "https://" in remote_url:
-#                 # https://github.com/owner/repo
-#                 parts = remote_url.split("github.com/")[1].split("/")
-#             else:
-#                 # git@github.com:owner/repo
-#                 parts = remote_url.split(":")[1].split("/")
 #
-#             if len(parts) >= 2:
-#                 return parts[0], parts[1]
+# def _on_put_not_found(response: requests.Response, target: str) -> bool:
+#     """Handle 404: unknown repository or branch"""
+#     print_error(f"Repository or branch not found: {target}")
+#     print_info("Make sure the branch exists and you have access.")
+#     return False
 #
-#         return None, None
 #
-#     except subprocess.CalledProcessError:
-#         return None, None
+# def _on_put_failed(response: requests.Response, target: str) -> bool:
+#     """Handle any other status code"""
+#     print_error(f"Failed to protect {target} with status code: {response.status_code}")
+#     print_error(f"Response: {response.text}")
+#     return False
 #
 #
-# def apply_branch_protection(owner: str, repo: str, branch: str, token: str) -> bool:
+# # PUT response handlers by status code: print the outcome, return True on success
+# _PUT_HANDLERS: dict[int, Callable[[requests.Response, str], bool]] = {
+#     200: _on_put_applied,
+#     401: _on_put_unauthorized,
+#     403: _on_put_forbidden,
+#     404: _on_put_not_found,
+#     429: _on_put_rate_limited,
+# }
+#
+#
+# def apply_branch_protection(owner: str, repo: str, branch: str) -> requests.Response | None:
 #     """
 #     Apply branch protection rules using GitHub API
 #
@@ -130,92 +356,189 @@
 #         owner: Repository owner
 #         repo: Repository name
 #         branch: Branch name to protect
-#         token: GitHub personal access token
 #
 #     Returns:
-#         True if successful, False otherwise
+#         The PUT response if successful (its body is the applied protection), None otherwise
 #     """
 #     url = f"https://api.github.com/repos/{owner}/{repo}/branches/{branch}/protection"
 #
-#     headers = {"Accept": "application/vnd.github+json", "Authorization": f"Bearer {token}", "X-GitHub-Api-Version": "2022-11-28"}
-#
-#     print("Applying branch protection...")
-#     print("")
+#     emit(f"Applying branch protection to '{branch}'...")
+#     emit("")
 #
 #     try:
-#         response = requests.put(url, headers=headers, json=PROTECTION_CONFIG, timeout=30)
+#         response = _with_retry(lambda: _SESSION.put(url, data=_PROTECTION_BODY, headers={"Content-Type": "application/json"}, timeout=30))
 #
 #         if response.status_code == 200:
-#             print_success("Branch protection applied successfully!")
-#             return True
-#         elif response.status_code == 401:
-#             print_error("Authentication failed. Check your GITHUB_TOKEN.")
-#             print_info("Generate a token at: https://github.com/settings/tokens")
-#             print_info("Required scopes: repo (full control)")
-#             return False
-#         elif response.status_code == 403:
-#             print_error("Permission denied. You need admin access to this repository.")
-#             return False
-#         elif response.status_code == 404:
-#             print_error(f"Repository or branch not found: {owner}/{repo}/{branch}")
-#             print_info("Make sure the branch exists and you have access.")
-#             return False
-#         else:
-#             print_error(f"Failed with status code: {response.status_code}")
-#             print_error(f"Response: {response.text}")
-#             return False
+#             store_etag(owner, repo, branch, response.headers.get("ETag"))
 #
-#     except requests.exceptions.RequestException as e:
-#         print_error(f"Request failed: {e}")
-#         return False
+#         handler = _PUT_HANDLERS.get(response.status_code, _on_put_failed)
+#         return response if handler(response, f"{owner}/{repo}/{branch}") else None
 #
+#     except requests.exceptions.RequestException as e:
+#         print_error(f"Request failed for {owner}/{repo}/{branch}: {e}")
+#         return None
 #
-# def verify_protection(owner: str, repo: str, branch: str, token: str) -> None:
-#     """Verify branch protection is configured correctly"""
-#     url = f"https://api.github.com/repos/{owner}/{repo}/branches/{branch}/protection"
-#
-#     headers = {"Accept": "application/vnd.github+json", "Authorization": f"Bearer {token}", "X-GitHub-Api-Version": "2022-11-28"}
-#
-#     print("")
-#     print("Verifying configuration...")
-#     print("")
 #
+# def _parse_json(response: requests.Response) -> Any:
+#     """Decode a JSON response body, returning None if it isn't valid JSON"""
 #     try:
-#         response = requests.get(url, headers=headers, timeout=30)
+#         return orjson.loads(response.content) if orjson else response.json()
+#     except ValueError:
+#         return None
+#
+#
+# def print_protection(data: Mapping[str, Any], branch: str) -> None:
+#     """Print the interesting parts of a branch protection API response"""
+#     checks = data.get("required_status_checks") or _EMPTY
+#     reviews = data.get("required_pull_request_reviews") or _EMPTY
+#     admins = data.get("enforce_admins") or _EMPTY
+#     linear_history = data.get("required_linear_history") or _EMPTY
+#     contexts = ", ".join(checks.get("contexts") or _NO_CONTEXTS) or "none"
+#
+#     lines = [
+#         "",
+#         f"Current settings of '{branch}':",
+#         f"  • Required status checks: {contexts}",
+#         f"  • Required approvals: {reviews.get('required_approving_review_count', 0)}",
+#         f"  • Enforce for admins: {admins.get('enabled', False)}",
+#         f"  • Linear history: {linear_history.get('enabled', False)}",
+#     ]
+#     emit("\n".join(lines))
+#
+#
+# def verify_protection(owner: str, repo: str, branch: str, applied: requests.Response | None = None) -> None:
+#     """
+#     Verify branch protection is configured correctly
 #
-#         if response.status_code == 200:
-#             data = response.json()
-#             print_success("Verification successful")
-#             print("")
-#             print("Current settings:")
-#             print(f"  • Required status checks: {data.get('required_status_checks', {}).get('contexts', [])}")
-#             print(f"  • Required approvals: {data.get('required_pull_request_reviews', {}).get('required_approving_review_count', 0)}")
-#             print(f"  • Enforce for admins: {data.get('enforce_admins', {}).get('enabled', False)}")
-#             print(f"  • Linear history: {data.get('required_linear_history', {}).get('enabled', False)}")
-#         else:
-#             print_warning("Unable to verify settings (may still be applied)")
+#     A successful PUT already returns the resulting protection, so when its
+#     response is passed as applied and has a JSON body, no request is made.
+#     Otherwise the protection is fetched, sending the cached ETag as
+#     If-None-Match so an unchanged configuration is answered with 304 Not
+#     Modified (no body, no rate limit cost).
+#     """
+#     emit("")
+#     emit(f"Verifying configuration of '{branch}'...")
+#     emit("")
+#
+#     data = _parse_json(applied) if applied is not None else None
+#     if not isinstance(data, Mapping):
+#         url = f"https://api.github.com/repos/{owner}/{repo}/branches/{branch}/protection"
+#
+#         headers: dict[str, str] = {}
+#         etag = load_etag(owner, repo, branch)
+#         if etag:
+#             headers["If-None-Match"] = etag
+#
+#         try:
+#             response = _with_retry(lambda: _SESSION.get(url, headers=headers, timeout=30))
+#         except requests.exceptions.RequestException:
+#             print_warning(f"Verification request for '{branch}' failed (settings may still be applied)")
+#             return
+#
+#         if response.status_code == 304:
+#             print_success(f"Verification successful for '{branch}' (settings unchanged)")
+#             return
+#         if response.status_code != 200:
+#             print_warning(f"Unable to verify settings of '{branch}' (may still be applied)")
+#             return
+#
+#         store_etag(owner, repo, branch, response.headers.get("ETag"))
+#         data = _parse_json(response)
+#         if not isinstance(data, Mapping):
+#             print_warning(f"Unexpected verification response for '{branch}' (settings may still be applied)")
+#             return
+#
+#     print_success(f"Verification successful for '{branch}'")
+#     print_protection(data, branch)
+#
+#
+# def protect_many(owner: str, repo: str, branches: Sequence[str], token: str) -> dict[str, bool]:
+#     """
+#     Apply and verify branch protection for several branches concurrently
 #
-#     except requests.exceptions.RequestException:
-#         print_warning("Verification request failed (settings may still be applied)")
+#     Branches are processed on up to MAX_CONCURRENT_BRANCHES threads sharing
+#     the pooled session; each request is retried on its own, so one rate
+#     limited branch doesn't fail the whole batch. With several branches, each
+#     branch's output is collected and printed as one block, in the given order.
 #
+#     Args:
+#         owner: Repository owner
+#         repo: Repository name
+#         branches: Branch names to protect
+#         token: GitHub personal access token
 #
-# def main():
+#     Returns:
+#         Mapping of branch name to whether protection was applied
+#     """
+#     # Authenticate every request made through the shared session
+#     _SESSION.headers["Authorization"] = f"Bearer {token}"
+#     _AUTH_HINT_SHOWN.clear()
+#
+#     # A single branch prints as it goes, so progress (e.g. retries) stays visible
+#     collect = len(branches) > 1
+#
+#     def protect(branch: str) -> tuple[bool, list[tuple[str, TextIO]]]:
+#         lines: list[tuple[str, TextIO]] = []
+#         if collect:
+#             _OUTPUT.lines = lines
+#         try:
+#             applied = apply_branch_protection(owner, repo, branch)
+#             if applied is None:
+#                 return False, lines
+#             verify_protection(owner, repo, branch, applied)
+#             return True, lines
+#         finally:
+#             _OUTPUT.lines = None
+#
+#     results: dict[str, bool] = {}
+#     with ThreadPoolExecutor(max_workers=max(1, min(MAX_CONCURRENT_BRANCHES, len(branches)))) as pool:
+#         for branch, (success, lines) in zip(branches, pool.map(protect, branches), strict=True):
+#             if lines and results:
+#                 print("")
+#             for text, stream in lines:
+#                 print(text, file=stream)
+#             results[branch] = success
+#     return results
+#
+#
+# def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+#     """Parse command line arguments"""
+#     parser = argparse.ArgumentParser(description="Configure GitHub branch protection so all CI jobs must pass before merging.")
+#     parser.add_argument("-y", "--yes", action="store_true", help="apply without asking for confirmation (for CI)")
+#     parser.add_argument("--branch", action="append", dest="branches", metavar="BRANCH", help=f"branch to protect, repeatable (default: {BRANCH})")
+#     parser.add_argument("--owner", default=OWNER, help="repository owner (default: $GITHUB_OWNER or git remote)")
+#     parser.add_argument("--repo", default=REPO, help="repository name (default: $GITHUB_REPO or git remote)")
+#     args = parser.parse_args(argv)
+#
+#     # Deduplicate while keeping the order given on the command line
+#     args.branches = list(dict.fromkeys(args.branches or [BRANCH]))
+#     return args
+#
+#
+# def main(argv: Sequence[str] | None = None):
 #     """Main execution function"""
+#     args = parse_args(argv)
 #     print_header("Branch Protection Setup")
 #
 #     # Get configuration
-#     owner = OWNER
-#     repo = REPO
+#     owner = args.owner
+#     repo = args.repo
+#     branches = args.branches
 #
-#     # Auto-detect repository if not specified
+#     # Auto-detect whatever part of the repository was not specified
 #     if not owner or not repo:
 #         print_info("Auto-detecting repository from git remote...")
-#         owner, repo = get_repo_info()
+#         detected_owner, detected_repo = get_repo_info()
+#         owner = owner or detected_owner
+#         repo = repo or detected_repo
 #
 #         if not owner or not repo:
-#             print_error("Unable to detect repository. Please set GITHUB_OWNER and GITHUB_REPO")
+#             print_error("Unable to detect repository. Please pass --owner and --repo, or set GITHUB_OWNER and GITHUB_REPO")
 #             print("")
 #             print("Usage:")
+#             print("  python setup-branch-protection.py --owner your-username --repo your-repo")
+#             print("")
+#             print("Or:")
 #             print("  export GITHUB_OWNER=your-username")
 #             print("  export GITHUB_REPO=your-repo")
 #             print("  python setup-branch-protection.py")
@@ -235,60 +558,67 @@
 #         print("  export GITHUB_TOKEN=$(gh auth token)")
 #         sys.exit(1)
 #
-#     # Display configuration
-#     print(f"📦 Repository: {owner}/{repo}")
-#     print(f"🌿 Branch: {BRANCH}")
-#     print("")
+#     # Display configuration and what will be configured (written in one go)
+#     lines = [
+#         f"📦 Repository: {owner}/{repo}",
+#         f"🌿 Branch: {', '.join(branches)}",
+#         "",
+#         "Configuration to be applied:",
+#         "",
+#         "✅ Require status checks to pass before merging",
+#         f"   - Required checks: {', '.join(PROTECTION_CONFIG['required_status_checks']['contexts'])}",
+#         "   - Require branch to be up to date",
+#         "",
+#         "✅ Require pull request reviews",
+#         f"   - Required approving reviews: {PROTECTION_CONFIG['required_pull_request_reviews']['required_approving_review_count']}",
+#         "   - Dismiss stale reviews on new commits",
+#         "   - Require approval of most recent push",
+#         "",
+#         "✅ Require conversation resolution before merging",
+#         "✅ Require linear history (no merge commits)",
+#         "✅ Enforce restrictions for administrators",
+#         "❌ Block force pushes",
+#         "❌ Block branch deletion",
+#         "",
+#     ]
+#     sys.stdout.write("\n".join(lines) + "\n")
+#     sys.stdout.flush()
+#
+#     # Confirm (skipped with --yes)
+#     if not args.yes:
+#         response = input("Apply these settings? (y/N): ")
+#         if response.lower() not in ["y", "yes"]:
+#             print_warning("Cancelled")
+#             sys.exit(0)
 #
-#     # Show what will be configured
-#     print("Configuration to be applied:")
-#     print("")
-#     print("✅ Require status checks to pass before merging")
-#     print(f"   - Required checks: {', '.join(PROTECTION_CONFIG['required_status_checks']['contexts'])}")
-#     print("   - Require branch to be up to date")
-#     print("")
-#     print("✅ Require pull request reviews")
-#     print(f"   - Required approving reviews: {PROTECTION_CONFIG['required_pull_request_reviews']['required_approving_review_count']}")
-#     print("   - Dismiss stale reviews on new commits")
-#     print("   - Require approval of most recent push")
-#     print("")
-#     print("✅ Require conversation resolution before merging")
-#     print("✅ Require linear history (no merge commits)")
-#     print("✅ Enforce restrictions for administrators")
-#     print("❌ Block force pushes")
-#     print("❌ Block branch deletion")
 #     print("")
 #
-#     # Confirm
-#     response = input("Apply these settings? (y/N): ")
-#     if response.lower() not in ["y", "yes"]:
-#         print_warning("Cancelled")
-#         sys.exit(0)
-#
-#     print("")
+#     # Apply and verify protection
+#     results = protect_many(owner, repo, branches, GITHUB_TOKEN)
+#     failed = [branch for branch, success in results.items() if not success]
 #
-#     # Apply protection
-#     success = apply_branch_protection(owner, repo, BRANCH, GITHUB_TOKEN)
-#
-#     if success:
+#     if not failed:
 #         # Show summary
-#         print("")
-#         print("Summary:")
-#         print(f"  • Direct pushes to '{BRANCH}' are now blocked")
-#         print("  • All changes must go through Pull Requests")
-#         print(f"  • CI jobs ({', '.join(PROTECTION_CONFIG['required_status_checks']['contexts'])}) must pass")
-#         print(f"  • {PROTECTION_CONFIG['required_pull_request_reviews']['required_approving_review_count']} approval(s) required")
-#         print("")
-#         print("View settings at:")
-#         print(f"  https://github.com/{owner}/{repo}/settings/branches")
-#
-#         # Verify
-#         verify_protection(owner, repo, BRANCH, GITHUB_TOKEN)
+#         protected = ", ".join(f"'{branch}'" for branch in branches)
+#         lines = [
+#             "",
+#             "Summary:",
+#             f"  • Direct pushes to {protected} are now blocked",
+#             "  • All changes must go through Pull Requests",
+#             f"  • CI jobs ({', '.join(PROTECTION_CONFIG['required_status_checks']['contexts'])}) must pass",
+#             f"  • {PROTECTION_CONFIG['required_pull_request_reviews']['required_approving_review_count']} approval(s) required",
+#             "",
+#             "View settings at:",
+#             f"  https://github.com/{owner}/{repo}/settings/branches",
+#         ]
+#         sys.stdout.write("\n".join(lines) + "\n")
+#         sys.stdout.flush()
 #
 #         print("")
 #         print_header("Setup Complete!")
 #     else:
 #         print("")
+#         print_error(f"Failed to protect: {', '.join(failed)}")
 #         print_header("Setup Failed")
 #         sys.exit(1)
 #
@@ -300,3 +630,5 @@
 #         print("")
 #         print_warning("Cancelled by user")
 #         sys.exit(0)
+#     finally:
+#         _SESSION.close()